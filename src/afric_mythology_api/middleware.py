@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_string
+import brotli
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+re_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, whichever the client accepts (brotli first).
+
+    Like django.middleware.gzip.GZipMiddleware, but with a configurable size
+    threshold (COMPRESSION_MIN_SIZE, in bytes) and brotli support. Streaming
+    responses are left untouched.
+
+    Against BREACH, only the API media types (COMPRESSION_CONTENT_TYPES) are
+    compressed, so HTML pages carrying a CSRF token (admin, browsable API)
+    never are, and gzip output is padded with random bytes like GZipMiddleware.
+    """
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.content_types = getattr(settings, 'COMPRESSION_CONTENT_TYPES', ['application/json'])
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in self.content_types:
+            return response
+        if len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if re_accepts_brotli.search(accept_encoding):
+            encoding, compressed = 'br', brotli.compress(response.content, quality=4)
+        elif re_accepts_gzip.search(accept_encoding):
+            encoding, compressed = 'gzip', compress_string(response.content, max_random_bytes=self.max_random_bytes)
+        else:
+            return response
+
+        # Ne garder la version compressée que si elle est plus petite
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+
+        # Comme GZipMiddleware : l'ETag d'une réponse compressée devient faible
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
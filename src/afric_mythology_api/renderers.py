@@ -0,0 +1,41 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+import msgpack
+import orjson
+
+# Types que orjson / msgpack ne savent pas sérialiser (Decimal, lazy strings, ...)
+default_encoder = encoders.JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+
+    Falls back to DRF's JSONRenderer when an indented output is requested
+    (browsable API, `indent` media type parameter).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # Les dates passent par l'encodeur de DRF pour garder le même format ('Z' pour UTC)
+        return orjson.dumps(
+            data,
+            default=default_encoder,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """ MessagePack renderer, selected with `Accept: application/msgpack` or `?format=msgpack` """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=default_encoder, use_bin_type=True)
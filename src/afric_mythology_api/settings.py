@@ -51,6 +51,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'afric_mythology_api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,6 +81,48 @@ TEMPLATES = [
 WSGI_APPLICATION = 'afric_mythology_api.wsgi.application'
 
 
+# Django REST Framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'afric_mythology_api.renderers.FastJSONRenderer',
+        'afric_mythology_api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'afric_mythology_api.throttling.TokenBucketThrottle',
+    ],
+    # Nombre de proxies de confiance devant l'API. À 0, l'IP du client est
+    # REMOTE_ADDR et l'en-tête X-Forwarded-For (falsifiable) est ignoré.
+    'NUM_PROXIES': env.int("NUM_PROXIES", default=0),
+}
+
+# Limitation de débit par client (utilisateur, clé d'API ou IP), voir throttling.py.
+# Chaque client dispose de CAPACITY jetons, rechargés à REFILL_RATE jetons par
+# seconde. Les seaux sont gardés en mémoire dans chaque processus, ou dans le
+# cache CACHE (par exemple un Redis défini par CACHE_URL) pour être partagés.
+RATE_LIMIT = {
+    'CAPACITY': env.int("RATE_LIMIT_CAPACITY", default=120),
+    'REFILL_RATE': env.float("RATE_LIMIT_REFILL_RATE", default=2.0),
+    'CACHE': env("RATE_LIMIT_CACHE", default=None),
+    # Nombre maximal de clients suivis en mémoire par processus
+    'MAX_CLIENTS': env.int("RATE_LIMIT_MAX_CLIENTS", default=100000),
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# Responses smaller than this (in bytes) are not compressed (brotli if installed, else gzip)
+COMPRESSION_MIN_SIZE = env.int("COMPRESSION_MIN_SIZE", default=1024)
+# Only these media types are compressed: never text/html, which may carry a CSRF token (BREACH)
+COMPRESSION_CONTENT_TYPES = ['application/json', 'application/msgpack']
+
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -90,17 +133,24 @@ WSGI_APPLICATION = 'afric_mythology_api.wsgi.application'
 #     }
 # }
 
+# Mode snapshot en lecture seule (voir la commande build_snapshot) : les entités
+# sont servies depuis ce fichier et aucune base de données n'est nécessaire.
+ENTITY_SNAPSHOT = env("ENTITY_SNAPSHOT", default=None)
+
 # Configuration de la base de données
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': env('DB_NAME'),
-        'USER': env('DB_USER'),
-        'PASSWORD': env('DB_PASSWORD'),
-        'HOST': env('DB_HOST'),
-        'PORT': env('DB_PORT'),
+if ENTITY_SNAPSHOT:
+    DATABASES = {}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': env('DB_NAME'),
+            'USER': env('DB_USER'),
+            'PASSWORD': env('DB_PASSWORD'),
+            'HOST': env('DB_HOST'),
+            'PORT': env('DB_PORT'),
+        }
     }
-}
 
 
 # Password validation
@@ -0,0 +1,271 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from .middleware import CompressionMiddleware
+from .renderers import FastJSONRenderer, MessagePackRenderer
+from .throttling import CacheBucketStore, LocalBucketStore, RateLimitMixin, TokenBucketThrottle, get_bucket_store
+import brotli
+import gzip
+import hashlib
+import json
+import msgpack
+import os
+
+DATA = {
+    'name': 'Mokele-mbembe',
+    'habitat': 'Marais de Likouala',
+    'domains': ['Ciel', 'Création'],
+    'date_created': datetime(2024, 10, 7, 18, 44, tzinfo=timezone.utc),
+    'weight': Decimal('1.5'),
+}
+
+
+class DataView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = []
+
+    def get(self, request):
+        return Response(DATA)
+
+
+class RendererTests(SimpleTestCase):
+    def get(self, path='/', **extra):
+        response = DataView.as_view()(APIRequestFactory().get(path, **extra))
+        response.render()
+        return response
+
+    def test_fast_json_matches_drf_json(self):
+        content = FastJSONRenderer().render(DATA)
+        self.assertEqual(json.loads(content), json.loads(JSONRenderer().render(DATA)))
+        self.assertNotIn(b' ', content.replace(b'Marais de Likouala', b''))
+
+    def test_json_by_default(self):
+        response = self.get()
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(response.content)['date_created'], '2024-10-07T18:44:00Z')
+
+    def test_indented_json_falls_back(self):
+        response = self.get(HTTP_ACCEPT='application/json; indent=4')
+        self.assertEqual(response.content, JSONRenderer().render(DATA, 'application/json; indent=4'))
+        self.assertIn(b'\n    "name"', response.content)
+
+    def test_msgpack_format_parameter(self):
+        response = self.get('/?format=msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), json.loads(JSONRenderer().render(DATA)))
+
+    def test_msgpack_accept_header(self):
+        response = self.get(HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)['domains'], ['Ciel', 'Création'])
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+        self.assertEqual(MessagePackRenderer().render(None), b'')
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(SimpleTestCase):
+    content = json.dumps([DATA['habitat']] * 200).encode()
+
+    def get(self, content=None, content_type='application/json', accept_encoding='gzip, br', **headers):
+        def get_response(request):
+            response = HttpResponse(self.content if content is None else content, content_type=content_type)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(get_response)(request)
+
+    def test_gzip(self):
+        response = self.get(accept_encoding='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(gzip.decompress(response.content), self.content)
+
+    def test_brotli_preferred(self):
+        response = self.get()
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.content)
+
+    def test_not_accepted(self):
+        response = self.get(accept_encoding='')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, self.content)
+
+    def test_below_threshold(self):
+        response = self.get(content=self.content[:1000])
+        self.assertFalse(response.has_header('Content-Encoding'))
+        with self.settings(COMPRESSION_MIN_SIZE=500):
+            self.assertEqual(self.get(content=self.content[:1000], accept_encoding='gzip')['Content-Encoding'], 'gzip')
+
+    def test_larger_result_not_kept(self):
+        content = os.urandom(4096)
+        response = self.get(content=content, accept_encoding='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, content)
+
+    def test_html_not_compressed(self):
+        response = self.get(content_type='text/html; charset=utf-8')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_msgpack_compressed(self):
+        response = self.get(content_type='application/msgpack', accept_encoding='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_already_encoded(self):
+        response = self.get(**{'Content-Encoding': 'identity'})
+        self.assertEqual(response['Content-Encoding'], 'identity')
+        self.assertEqual(response.content, self.content)
+
+    def test_weak_etag(self):
+        self.assertEqual(self.get(ETag='"abc"', accept_encoding='gzip')['ETag'], 'W/"abc"')
+        self.assertEqual(self.get(ETag='W/"abc"', accept_encoding='gzip')['ETag'], 'W/"abc"')
+
+
+class Clock:
+    """ Replaces time.time in throttling.py """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class LocalBucketStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch('afric_mythology_api.throttling.time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_consume_and_refill(self):
+        store = LocalBucketStore(capacity=10, refill_rate=2)
+        self.assertEqual(store.consume('a', 4), (True, 6))
+        self.assertEqual(store.consume('a', 4), (True, 2))
+        self.assertEqual(store.consume('a', 4), (False, 2))
+        self.clock.now += 1
+        self.assertEqual(store.consume('a', 4), (True, 0))
+        self.clock.now += 60
+        self.assertEqual(store.consume('a', 1), (True, 9))
+        self.assertEqual(store.consume('b', 10), (True, 0))
+
+    def test_least_recently_used_bucket_dropped(self):
+        store = LocalBucketStore(capacity=10, refill_rate=1, max_clients=2)
+        store.consume('a', 5)
+        store.consume('b', 5)
+        store.consume('a', 1)
+        store.consume('c', 5)
+        self.assertEqual(list(store.buckets), ['a', 'c'])
+        self.assertEqual(store.consume('b', 1), (True, 9))
+
+
+@override_settings(CACHES={'ratelimit': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ratelimit-tests'}})
+class CacheBucketStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch('afric_mythology_api.throttling.time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = CacheBucketStore(capacity=10, refill_rate=2, alias='ratelimit')
+        self.addCleanup(self.store.cache.clear)
+
+    def test_consume_and_refill(self):
+        self.assertEqual(self.store.consume('a', 4), (True, 6))
+        self.assertEqual(self.store.consume('a', 8), (False, 6))
+        self.clock.now += 1
+        self.assertEqual(self.store.consume('a', 8), (True, 0))
+        self.assertEqual(self.store.consume('b', 10), (True, 0))
+        self.assertIsNone(self.store.cache.get('ratelimit:a:lock'))
+
+    @mock.patch('afric_mythology_api.throttling.time.sleep')
+    def test_locked_bucket_refused(self, sleep):
+        self.store.cache.add('ratelimit:a:lock', 1)
+        self.assertEqual(self.store.consume('a', 1), (False, 0))
+        self.assertEqual(sleep.call_count, CacheBucketStore.lock_attempts)
+        self.assertIsNone(self.store.cache.get('ratelimit:a'))
+
+
+class RateLimitedView(RateLimitMixin, APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = [TokenBucketThrottle]
+    throttle_costs = {None: 3}
+
+    def get(self, request):
+        return Response({})
+
+
+@override_settings(RATE_LIMIT={'CAPACITY': 10, 'REFILL_RATE': 1.0, 'CACHE': None})
+class TokenBucketThrottleTests(SimpleTestCase):
+    def setUp(self):
+        get_bucket_store.cache_clear()
+        self.addCleanup(get_bucket_store.cache_clear)
+        self.clock = Clock()
+        patcher = mock.patch('afric_mythology_api.throttling.time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, **extra):
+        return RateLimitedView.as_view()(APIRequestFactory().get('/', **extra))
+
+    def test_headers_and_429(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            (response['RateLimit-Limit'], response['RateLimit-Remaining'], response['RateLimit-Reset']),
+            ('10', '7', '3'),
+        )
+        self.get()
+        self.get()
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['RateLimit-Remaining'], '1')
+        self.assertEqual(response['Retry-After'], '2')
+
+        self.clock.now += 2
+        self.assertEqual(self.get().status_code, 200)
+
+    def test_forwarded_for_ignored_without_proxies(self):
+        for index in range(4):
+            response = self.get(HTTP_X_FORWARDED_FOR=f'10.0.0.{index}')
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1})
+    def test_forwarded_for_trusted_behind_proxy(self):
+        for index in range(4):
+            response = self.get(HTTP_X_FORWARDED_FOR=f'10.0.0.{index}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['RateLimit-Remaining'], '7')
+
+    def test_non_positive_rates_rejected(self):
+        for config in [{'CAPACITY': 10, 'REFILL_RATE': 0.0}, {'CAPACITY': 0, 'REFILL_RATE': 1.0}]:
+            get_bucket_store.cache_clear()
+            with self.settings(RATE_LIMIT={**config, 'CACHE': None}), self.assertRaises(ImproperlyConfigured):
+                get_bucket_store()
+
+    def test_keys(self):
+        throttle = TokenBucketThrottle()
+        request = RateLimitedView().initialize_request(APIRequestFactory().get('/', REMOTE_ADDR='10.1.2.3'))
+        self.assertEqual(throttle.get_cache_key(request), 'ip:10.1.2.3')
+
+        django_request = APIRequestFactory().get('/')
+        force_authenticate(django_request, token='secret-key')
+        request = APIView().initialize_request(django_request)
+        self.assertEqual(throttle.get_cache_key(request), f"auth:{hashlib.sha256(b'secret-key').hexdigest()}")
+
+        django_request = APIRequestFactory().get('/')
+        force_authenticate(django_request, user=mock.Mock(pk=42, is_authenticated=True))
+        request = APIView().initialize_request(django_request)
+        self.assertEqual(throttle.get_cache_key(request), 'user:42')
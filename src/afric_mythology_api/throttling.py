@@ -0,0 +1,169 @@
+from collections import OrderedDict
+import functools
+import hashlib
+import math
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import BaseThrottle
+
+
+class BucketStore:
+    """
+    Token buckets: every client has `capacity` tokens, refilled at
+    `refill_rate` tokens per second, and each request consumes its cost.
+    """
+
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+
+    def refill(self, bucket, now):
+        if bucket is None:
+            return self.capacity
+        tokens, updated = bucket
+        return min(self.capacity, tokens + (now - updated) * self.refill_rate)
+
+    def take(self, bucket, cost, now):
+        """Return (allowed, tokens left) once `cost` tokens are taken from bucket."""
+        tokens = self.refill(bucket, now)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        return allowed, tokens
+
+    def consume(self, key, cost):
+        """Take `cost` tokens from the bucket of key, return (allowed, tokens left)."""
+        raise NotImplementedError('.consume() must be overridden')
+
+
+class LocalBucketStore(BucketStore):
+    """
+    Token buckets kept in the process memory.
+
+    At most `max_clients` buckets are kept, the least recently used one is
+    dropped first (it is then as good as full again).
+    """
+
+    def __init__(self, capacity, refill_rate, max_clients=100000):
+        super().__init__(capacity, refill_rate)
+        self.max_clients = max_clients
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, cost):
+        now = time.time()
+        with self.lock:
+            allowed, tokens = self.take(self.buckets.get(key), cost, now)
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class CacheBucketStore(BucketStore):
+    """
+    Token buckets kept in a Django cache, shared between processes or hosts.
+
+    Each update holds a per-client lock taken with cache.add(), atomic on
+    every cache backend. A request that cannot get the lock after
+    `lock_attempts` tries is refused without touching the bucket.
+    """
+    lock_timeout = 1
+    lock_attempts = 20
+    lock_interval = 0.005
+
+    def __init__(self, capacity, refill_rate, alias):
+        super().__init__(capacity, refill_rate)
+        self.cache = caches[alias]
+        self.timeout = math.ceil(capacity / refill_rate)
+
+    def consume(self, key, cost):
+        key = f'ratelimit:{key}'
+        lock_key = f'{key}:lock'
+        for _ in range(self.lock_attempts):
+            if self.cache.add(lock_key, 1, self.lock_timeout):
+                break
+            time.sleep(self.lock_interval)
+        else:
+            return False, 0
+
+        try:
+            now = time.time()
+            allowed, tokens = self.take(self.cache.get(key), cost, now)
+            self.cache.set(key, (tokens, now), self.timeout)
+        finally:
+            self.cache.delete(lock_key)
+        return allowed, tokens
+
+
+@functools.cache
+def get_bucket_store():
+    """Return the bucket store configured by settings.RATE_LIMIT, created once per process."""
+    config = settings.RATE_LIMIT
+    if config['CAPACITY'] <= 0 or config['REFILL_RATE'] <= 0:
+        raise ImproperlyConfigured('RATE_LIMIT CAPACITY and REFILL_RATE must be positive.')
+    if config.get('CACHE'):
+        return CacheBucketStore(config['CAPACITY'], config['REFILL_RATE'], config['CACHE'])
+    return LocalBucketStore(config['CAPACITY'], config['REFILL_RATE'], config.get('MAX_CLIENTS', 100000))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket throttle keyed by user, API key (request.auth, hashed) or
+    client IP.
+
+    The IP is REMOTE_ADDR, X-Forwarded-For is only trusted when
+    REST_FRAMEWORK['NUM_PROXIES'] says how many proxies sit in front of the API.
+
+    Each request costs `view.get_throttle_cost(request)` tokens (1 if the view
+    does not define it). The bucket state is kept on `request.rate_limit` for
+    the RateLimit-* headers (see RateLimitMixin).
+    """
+
+    def get_cache_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        if request.auth is not None:
+            # Jamais la clé d'API en clair dans le cache partagé
+            return f'auth:{hashlib.sha256(str(request.auth).encode()).hexdigest()}'
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        cost = view.get_throttle_cost(request) if hasattr(view, 'get_throttle_cost') else 1
+        store = get_bucket_store()
+        allowed, tokens = store.consume(self.get_cache_key(request), cost)
+
+        self.wait_seconds = 0 if allowed else (cost - tokens) / store.refill_rate
+        request.rate_limit = {
+            'limit': store.capacity,
+            'remaining': math.floor(tokens),
+            'reset': math.ceil((store.capacity - tokens) / store.refill_rate),
+        }
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class RateLimitMixin:
+    """
+    Per-action throttle costs for TokenBucketThrottle, and RateLimit-Limit,
+    RateLimit-Remaining and RateLimit-Reset response headers.
+    """
+    throttle_costs = {}
+
+    def get_throttle_cost(self, request):
+        return self.throttle_costs.get(getattr(self, 'action', None), 1)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        rate_limit = getattr(request, 'rate_limit', None)
+        if rate_limit is not None:
+            response['RateLimit-Limit'] = str(rate_limit['limit'])
+            response['RateLimit-Remaining'] = str(rate_limit['remaining'])
+            response['RateLimit-Reset'] = str(rate_limit['reset'])
+        return response
@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class EntitiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'entities'
+
+    def ready(self):
+        # En mode snapshot, un fichier absent ou invalide doit empêcher le
+        # démarrage plutôt que faire échouer chaque requête
+        if settings.ENTITY_SNAPSHOT:
+            from .snapshot import SnapshotError, get_snapshot
+            try:
+                get_snapshot()
+            except (OSError, SnapshotError) as e:
+                raise ImproperlyConfigured(f'ENTITY_SNAPSHOT: {e}') from e
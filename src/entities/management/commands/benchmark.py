@@ -0,0 +1,225 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max, Min
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+from afric_mythology_api.renderers import FastJSONRenderer, MessagePackRenderer
+from afric_mythology_api.throttling import get_bucket_store
+from entities.models import Entity
+from entities.serializers import EntitySerializer
+from entities.synthetic import SYLLABLES, write_corpus
+from datetime import datetime, timezone
+import brotli
+import django
+import functools
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+
+PAGE_SIZE = 20
+RENDER_PAGE_SIZE = 1000
+
+# Sélections de champs mesurées sur l'API, du plus léger au plus complet
+FIELD_SELECTIONS = {
+    'minimal': {'fields': 'id,name,entity_type,country_of_origin'},
+    'details': {'fields': 'id,name,entity_type', 'expand': 'details'},
+    'full': {},
+}
+
+# Pas de limitation de débit pendant le benchmark
+UNLIMITED_RATE = {'CAPACITY': 10 ** 12, 'REFILL_RATE': 1.0, 'CACHE': None}
+
+
+class QueryCounter:
+    """ Count the SQL queries going through the connection (see connection.execute_wrapper) """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[round(pct / 100 * (len(ordered) - 1))]
+
+
+def traced_peak_kb(operation):
+    """Run operation and return the peak of Python memory allocated meanwhile, in KiB."""
+    tracemalloc.start()
+    try:
+        operation()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def entity_queryset():
+    return (
+        Entity.objects
+        .select_related('created_by', 'divinity_details', 'hero_details', 'creature_details')
+        .prefetch_related('images')
+    )
+
+
+class Command(BaseCommand):
+    """ Benchmark load_data and the entity API on a synthetic corpus """
+    help = 'Benchmark load_data and the entity API on a synthetic corpus, results are written as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000],
+            help='Corpus sizes to benchmark. load_data inserts one entity at a time, '
+                 'so 100000 takes minutes and 1000000 takes hours and several GB of RAM.',
+        )
+        parser.add_argument('--iterations', type=int, default=200, help='Number of timed calls per read operation')
+        parser.add_argument('--render-iterations', type=int, default=20, help='Number of timed renders of a 1000 entities page')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the corpus and the requests')
+        parser.add_argument('--output', type=str, default='benchmark_results.json', help='Json File to write results to')
+        parser.add_argument(
+            '--noinput', '--no-input', action='store_false', dest='interactive',
+            help='Do not prompt before deleting an existing test database.',
+        )
+
+    def handle(self, *args, **kwargs):
+        results = {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'seed': kwargs['seed'],
+            'iterations': kwargs['iterations'],
+            'render_iterations': kwargs['render_iterations'],
+            'runs': [],
+        }
+
+        setup_test_environment()
+        get_bucket_store.cache_clear()
+        try:
+            with override_settings(RATE_LIMIT=UNLIMITED_RATE):
+                for size in kwargs['sizes']:
+                    self.stdout.write(f'Benchmarking {size} entities...')
+                    # Base de test dédiée, détruite après chaque taille
+                    old_name = connection.creation.create_test_db(
+                        verbosity=0, autoclobber=not kwargs['interactive'], serialize=False,
+                    )
+                    try:
+                        run = self.run(size, kwargs['iterations'], kwargs['seed'])
+                        run['render'] = self.measure_rendering(kwargs['render_iterations'])
+                        results['runs'].append(run)
+                    finally:
+                        connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            get_bucket_store.cache_clear()
+            teardown_test_environment()
+
+        with open(kwargs['output'], 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+        self.stdout.write(self.style.SUCCESS(f"Results written to '{kwargs['output']}'."))
+
+    def run(self, size, iterations, seed):
+        run = {'size': size}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            json_file = os.path.join(tmp, 'corpus.json')
+            write_corpus(json_file, size, seed=seed)
+
+            counter = QueryCounter()
+            with open(os.devnull, 'w') as devnull:
+                # Chargement chronométré, sans tracemalloc qui le ralentit fortement
+                with connection.execute_wrapper(counter):
+                    start = time.perf_counter()
+                    call_command('load_data', json_file, stdout=devnull)
+                    elapsed = time.perf_counter() - start
+
+                # Second chargement dans la base vidée, pour la mémoire seulement
+                call_command('flush', interactive=False, verbosity=0)
+                peak_kb = traced_peak_kb(lambda: call_command('load_data', json_file, stdout=devnull))
+
+        run['load_data'] = {
+            'seconds': elapsed,
+            'entities_per_second': size / elapsed if elapsed else None,
+            'queries': counter.count,
+            'peak_memory_kb': peak_kb,
+        }
+
+        rng = random.Random(seed)
+        bounds = Entity.objects.aggregate(first=Min('pk'), last=Max('pk'))
+        last_page = max((size - 1) // PAGE_SIZE, 0)
+
+        client = Client()
+
+        def list_entities(params):
+            return client.get('/api/entities/', {'page': rng.randint(1, last_page + 1), **params})
+
+        def retrieve_entity(params):
+            return client.get(f"/api/entities/{rng.randint(bounds['first'], bounds['last'])}/", params)
+
+        def search_entities(params):
+            return client.get('/api/entities/', {'search': ''.join(rng.sample(SYLLABLES, 2)), **params})
+
+        for action, request in [('list', list_entities), ('detail', retrieve_entity), ('search', search_entities)]:
+            for selection, params in FIELD_SELECTIONS.items():
+                run[f'{action}_{selection}'] = self.measure(functools.partial(request, params), iterations)
+        return run
+
+    def measure(self, operation, iterations):
+        """Time `iterations` API calls made by operation, which returns the response."""
+        timings, sizes = [], []
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            for _ in range(iterations):
+                start = time.perf_counter()
+                response = operation()
+                timings.append((time.perf_counter() - start) * 1000)
+                sizes.append(len(response.content))
+
+        return {
+            'p50_ms': percentile(timings, 50),
+            'p90_ms': percentile(timings, 90),
+            'p99_ms': percentile(timings, 99),
+            'max_ms': max(timings),
+            'queries_per_call': counter.count / iterations,
+            'mean_bytes': sum(sizes) / iterations,
+            # Appel supplémentaire, hors chronométrage, pour la mémoire
+            'peak_memory_kb': traced_peak_kb(operation),
+        }
+
+    def measure_rendering(self, iterations):
+        """Time each renderer and compression on a full page of RENDER_PAGE_SIZE entities."""
+        data = EntitySerializer(entity_queryset().order_by('pk')[:RENDER_PAGE_SIZE], many=True).data
+
+        renderers = {'json': JSONRenderer(), 'fast_json': FastJSONRenderer(), 'msgpack': MessagePackRenderer()}
+        compressors = {
+            'gzip': compress_string,
+            'br': lambda content: brotli.compress(content, quality=4),
+        }
+
+        results = {'entities': len(data)}
+        for name, renderer in renderers.items():
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                content = renderer.render(data)
+                timings.append((time.perf_counter() - start) * 1000)
+            result = {'p50_ms': percentile(timings, 50), 'bytes': len(content)}
+
+            for encoding, compress in compressors.items():
+                start = time.perf_counter()
+                compressed = compress(content)
+                result[encoding] = {
+                    'ms': (time.perf_counter() - start) * 1000,
+                    'bytes': len(compressed),
+                }
+            results[name] = result
+        return results
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from afric_mythology_api.renderers import FastJSONRenderer
+from entities.models import Entity
+from entities.serializers import EntitySerializer
+from entities.snapshot import write_snapshot
+import os
+
+
+class Command(BaseCommand):
+    """ Build a read-only snapshot of all entities, served when ENTITY_SNAPSHOT is set """
+    help = 'Build a read-only snapshot of all entities, served when ENTITY_SNAPSHOT is set'
+
+    def add_arguments(self, parser):
+        parser.add_argument('snapshot_file', type=str, help='Snapshot File to write')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Number of entities fetched per query')
+
+    def handle(self, *args, **kwargs):
+        snapshot_file = kwargs['snapshot_file']
+        renderer = FastJSONRenderer()
+
+        queryset = (
+            Entity.objects
+            .order_by('pk')
+            .select_related('created_by', 'divinity_details', 'hero_details', 'creature_details')
+            .prefetch_related('images')
+        )
+
+        def entities():
+            for entity in queryset.iterator(chunk_size=kwargs['chunk_size']):
+                content = renderer.render(EntitySerializer(entity).data)
+                yield entity.pk, entity.name, content
+
+        # Écriture dans un fichier temporaire puis remplacement atomique :
+        # les workers qui ont déjà ouvert l'ancien snapshot continuent de le lire
+        tmp_file = f'{snapshot_file}.tmp'
+        count = write_snapshot(tmp_file, entities())
+        os.replace(tmp_file, snapshot_file)
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} entities to '{snapshot_file}'."))
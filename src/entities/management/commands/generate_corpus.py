@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from entities.synthetic import write_corpus
+
+
+class Command(BaseCommand):
+    """ Generate a synthetic mythology corpus loadable with load_data """
+    help = 'Generate a synthetic mythology corpus loadable with load_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('json_file', type=str, help='Json File to write the corpus to')
+        parser.add_argument('--count', type=int, default=1000, help='Number of entities to generate')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, same seed gives the same corpus')
+        parser.add_argument('--no-images', action='store_true', help='Do not generate image metadata')
+
+    def handle(self, *args, **kwargs):
+        json_file = kwargs['json_file']
+        count = kwargs['count']
+
+        write_corpus(json_file, count, seed=kwargs['seed'], images=not kwargs['no_images'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {count} entities to '{json_file}'."))
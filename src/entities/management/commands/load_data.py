@@ -1,5 +1,5 @@
 from django.core.management.base import BaseCommand
-from entities.models import Entity, DivinityDetails, HeroDetails, MythicalCreatureDetails
+from entities.models import Entity, ImageWithCaption, DivinityDetails, HeroDetails, MythicalCreatureDetails
 from django.contrib.auth import get_user_model
 import json
 
@@ -92,6 +92,14 @@ class Command(BaseCommand):
                     )
                     self.stdout.write(self.style.SUCCESS(f"Mythical creature details for '{entity_obj.name}' created successfully."))
 
+                # Images (chemins relatifs à MEDIA_ROOT)
+                for image in entity.get('images', []):
+                    image_obj = ImageWithCaption.objects.create(
+                        image=image['image'],
+                        caption=image.get('caption'),
+                    )
+                    entity_obj.images.add(image_obj)
+
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f"Error creating entity '{entity.get('name', 'Unknown')}': {e}"))
                 continue  # Passer à l'entité suivante en cas d'erreur
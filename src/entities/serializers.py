@@ -0,0 +1,68 @@
+from rest_framework import serializers
+from .models import Entity, ImageWithCaption, DivinityDetails, HeroDetails, MythicalCreatureDetails
+
+
+class ImageWithCaptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImageWithCaption
+        fields = ['id', 'image', 'caption']
+
+
+class DivinityDetailsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DivinityDetails
+        exclude = ['id', 'entity']
+
+
+class HeroDetailsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = HeroDetails
+        exclude = ['id', 'entity']
+
+
+class MythicalCreatureDetailsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MythicalCreatureDetails
+        exclude = ['id', 'entity']
+
+
+class EntitySerializer(serializers.ModelSerializer):
+    """
+    Serializer for entities.
+
+    The fields to render can be restricted with the `selected_fields` context
+    key (see EntityViewSet), every field is rendered otherwise.
+    """
+    created_by = serializers.SlugRelatedField(slug_field='username', read_only=True)
+    images = ImageWithCaptionSerializer(many=True, read_only=True)
+    divinity_details = DivinityDetailsSerializer(read_only=True)
+    hero_details = HeroDetailsSerializer(read_only=True)
+    creature_details = MythicalCreatureDetailsSerializer(read_only=True)
+
+    # Champs coûteux (jointure ou requête supplémentaire), rendus seulement si demandés
+    EXPANDABLE_FIELDS = ['created_by', 'images', 'divinity_details', 'hero_details', 'creature_details']
+
+    class Meta:
+        model = Entity
+        fields = [
+            'id',
+            'name',
+            'entity_type',
+            'country_of_origin',
+            'ethnicity',
+            'gender',
+            'date_created',
+            'date_modified',
+            'created_by',
+            'images',
+            'divinity_details',
+            'hero_details',
+            'creature_details',
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected_fields = self.context.get('selected_fields')
+        if selected_fields is not None:
+            for field_name in set(self.fields) - set(selected_fields):
+                self.fields.pop(field_name)
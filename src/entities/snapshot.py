@@ -0,0 +1,201 @@
+"""
+Read-only entity snapshot, a single memory-mapped file built by the
+build_snapshot command.
+
+Layout (little-endian, offsets in bytes from the start of the file):
+
+    header        MAGIC, count and the offset of each section below
+    records       one JSON document per entity (full API representation), by id
+    ids           count x uint64, entity ids in ascending order
+    record_ends   count x uint64, end of each record relative to `records`
+    names         lowercased entity names, each followed by a newline
+    name_ends     count x uint64, end of each name relative to `names`
+    name_index    count x uint64, record positions sorted by lowercased name
+
+Records are looked up by position. The id index is a binary search over
+`ids`, the name index a binary search over `name_index`, and name searches
+scan `names` with mmap.find(). The file is opened read-only, so the pages are
+shared between every worker process mapping it.
+"""
+import bisect
+import functools
+import mmap
+import orjson
+import os
+import struct
+from django.conf import settings
+
+MAGIC = b'AFMSNAP1'
+HEADER = struct.Struct('<8s7Q')
+UINT64 = struct.Struct('<Q')
+
+
+def normalize_name(name):
+    # lower() et non casefold() : comme LOWER()/UPPER() de Postgres, 'ß' reste 'ß'
+    return name.lower().replace('\n', ' ').encode('utf-8')
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class Column:
+    """ Read-only sequence of uint64 stored in the mapped file """
+
+    def __init__(self, buffer, offset, length):
+        self.buffer = buffer
+        self.offset = offset
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        return UINT64.unpack_from(self.buffer, self.offset + index * UINT64.size)[0]
+
+
+class Snapshot:
+    """ Entity snapshot reader, see the module docstring for the file layout """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            # mmap refuse les fichiers vides : un snapshot tronqué doit lever SnapshotError
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise SnapshotError(f"'{path}' is not an entity snapshot.")
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, records, ids, record_ends, names, name_ends, name_index = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC:
+            raise SnapshotError(f"'{path}' is not an entity snapshot.")
+
+        self.count = count
+        self.records_offset = records
+        self.names_offset = names
+        self.ids = Column(self.buffer, ids, count)
+        self.record_ends = Column(self.buffer, record_ends, count)
+        self.name_ends = Column(self.buffer, name_ends, count)
+        self.name_index = Column(self.buffer, name_index, count)
+
+    def __len__(self):
+        return self.count
+
+    def _span(self, ends, position):
+        start = ends[position - 1] if position else 0
+        return start, ends[position]
+
+    def record(self, position):
+        """Return the entity stored at position as a dict."""
+        start, end = self._span(self.record_ends, position)
+        content = self.buffer[self.records_offset + start:self.records_offset + end]
+        return orjson.loads(content)
+
+    def name(self, position):
+        """Return the lowercased name stored at position, as bytes."""
+        start, end = self._span(self.name_ends, position)
+        return self.buffer[self.names_offset + start:self.names_offset + end - 1]
+
+    def position_of(self, entity_id):
+        """Return the position of the entity with this id, or None."""
+        position = bisect.bisect_left(self.ids, entity_id)
+        if position < self.count and self.ids[position] == entity_id:
+            return position
+        return None
+
+    def find_by_name(self, name):
+        """Return the positions of the entities named `name` (case-insensitive), by id."""
+        key = normalize_name(name)
+        start = bisect.bisect_left(self.name_index, key, key=self.name)
+        end = bisect.bisect_right(self.name_index, key, lo=start, key=self.name)
+        return sorted(self.name_index[index] for index in range(start, end))
+
+    def search(self, terms):
+        """Return the positions of the entities whose name contains every term, by id."""
+        terms = [normalize_name(term) for term in terms if term]
+        if not terms:
+            return list(range(self.count))
+
+        first, others = terms[0], terms[1:]
+        names_end = self.names_offset + (self.name_ends[self.count - 1] if self.count else 0)
+        positions = []
+        offset = self.buffer.find(first, self.names_offset, names_end)
+        while offset != -1:
+            position = bisect.bisect_right(self.name_ends, offset - self.names_offset)
+            name = self.name(position)
+            if all(term in name for term in others):
+                positions.append(position)
+            # Reprendre la recherche au nom suivant
+            offset = self.buffer.find(first, self.names_offset + self.name_ends[position], names_end)
+        return positions
+
+
+class SnapshotRecords:
+    """ Lazy sequence of snapshot records, sliceable like a queryset (for pagination) """
+
+    def __init__(self, snapshot, positions=None):
+        self.snapshot = snapshot
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.snapshot) if self.positions is None else len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            positions = range(len(self))[index] if self.positions is None else self.positions[index]
+            return [self.snapshot.record(position) for position in positions]
+        position = index if self.positions is None else self.positions[index]
+        return self.snapshot.record(position)
+
+
+@functools.cache
+def get_snapshot():
+    """Return the snapshot configured by settings.ENTITY_SNAPSHOT, opened once per process."""
+    return Snapshot(settings.ENTITY_SNAPSHOT)
+
+
+def write_snapshot(path, entities):
+    """
+    Write a snapshot to `path` from an iterable of (id, name, content) tuples
+    sorted by id, content being the JSON document of the entity as bytes.
+    """
+    ids, record_ends, names = [], [], []
+
+    with open(path, 'wb') as f:
+        f.write(b'\0' * HEADER.size)
+
+        records_offset = f.tell()
+        size = 0
+        for entity_id, name, content in entities:
+            f.write(content)
+            size += len(content)
+            ids.append(entity_id)
+            record_ends.append(size)
+            names.append(normalize_name(name))
+
+        ids_offset = f.tell()
+        f.write(b''.join(UINT64.pack(value) for value in ids))
+
+        record_ends_offset = f.tell()
+        f.write(b''.join(UINT64.pack(value) for value in record_ends))
+
+        names_offset = f.tell()
+        name_ends, size = [], 0
+        for name in names:
+            f.write(name + b'\n')
+            size += len(name) + 1
+            name_ends.append(size)
+
+        name_ends_offset = f.tell()
+        f.write(b''.join(UINT64.pack(value) for value in name_ends))
+
+        name_index_offset = f.tell()
+        name_index = sorted(range(len(names)), key=names.__getitem__)
+        f.write(b''.join(UINT64.pack(value) for value in name_index))
+
+        f.seek(0)
+        f.write(HEADER.pack(
+            MAGIC, len(ids), records_offset, ids_offset, record_ends_offset,
+            names_offset, name_ends_offset, name_index_offset,
+        ))
+    return len(ids)
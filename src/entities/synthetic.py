@@ -0,0 +1,165 @@
+""" Synthetic mythology corpus, same shape as datas/entities_data.json """
+import json
+import random
+import unicodedata
+
+COUNTRIES = {
+    'Nigeria': ['Yoruba', 'Igbo', 'Haoussa', 'Edo'],
+    'Bénin': ['Fon', 'Yoruba', 'Bariba'],
+    'Mali': ['Mandingue', 'Dogon', 'Bambara', 'Peul'],
+    'Ghana': ['Akan', 'Ashanti', 'Ewe'],
+    'Sénégal': ['Wolof', 'Sérère', 'Peul'],
+    'République du Congo': ['Peuples Bantous', 'Kongo', 'Téké'],
+    'République démocratique du Congo': ['Kongo', 'Luba', 'Mongo'],
+    'Afrique du Sud': ['Zoulou', 'Xhosa', 'Sotho'],
+    'Kenya': ['Kikuyu', 'Masaï', 'Luo'],
+    'Éthiopie': ['Amhara', 'Oromo', 'Tigré'],
+    'Cameroun': ['Bamiléké', 'Douala', 'Fang'],
+    'Zimbabwe': ['Shona', 'Ndébélé'],
+}
+
+SYLLABLES = [
+    'a', 'ba', 'da', 'de', 'di', 'do', 'e', 'ga', 'gu', 'ka', 'ke', 'ki', 'ko', 'la', 'le',
+    'lo', 'ma', 'mbe', 'mi', 'mo', 'na', 'ndi', 'nga', 'ni', 'nyo', 'o', 'ra', 'ri', 'ro',
+    'sa', 'se', 'shi', 'su', 'ta', 'te', 'to', 'tu', 'wa', 'we', 'ya', 'yo', 'za', 'zu',
+]
+
+GENDERS = ['Male', 'Female', 'Androgynous', 'Spirit', 'Element', None]
+
+DOMAINS = [
+    'Ciel', 'Création', 'Soleil', 'Lune', 'Tonnerre', 'Pluie', 'Fertilité', 'Guerre', 'Mer',
+    'Rivières', 'Forêt', 'Mort', 'Sagesse', 'Justice', 'Pureté', 'Paix', 'Forge', 'Chasse',
+    'Récoltes', 'Amour', 'Divination', 'Vent', 'Terre', 'Feu',
+]
+SYMBOLS = [
+    'Soleil', 'Ciel', 'Éclair', 'Hache double', 'Blanc', 'Rouge', 'Miroir', 'Calebasse',
+    'Cauris', 'Tambour', 'Serpent arc-en-ciel', 'Masque d\'argent', 'Throne', 'Éventail',
+]
+CHARACTERISTICS = [
+    'Omnipotent', 'Omniscient', 'Sagesse', 'Compassion', 'Justice', 'Colérique', 'Rusé',
+    'Protecteur', 'Généreux', 'Jaloux', 'Patient', 'Imprévisible', 'Bienveillant',
+]
+ANIMALS = [
+    'Aigle', 'Lion', 'Léopard', 'Serpent', 'Python', 'Crocodile', 'Caméléon', 'Escargot',
+    'Bélier', 'Hibou', 'Araignée', 'Éléphant', 'Hyène', 'Tortue',
+]
+POWER_OBJECTS = [
+    'Soleil', 'Chaîne d\'argent', 'Houlette', 'Hache', 'Lance', 'Bâton sacré', 'Coupe de vin de palme',
+    'Collier de perles', 'Tambour parlant', 'Sabre', 'Arc',
+]
+ALIGNMENTS = ['Bienveillant', 'Neutre', 'Ambivalent', 'Malveillant']
+CULTURAL_ROLES = [
+    'Dieu suprême', 'Orisha de la pureté, de la paix et de la création', 'Déesse des eaux',
+    'Dieu du tonnerre', 'Gardien des ancêtres', 'Messager des dieux', 'Déesse de la fertilité',
+    'Dieu de la forge et de la guerre', 'Esprit de la forêt',
+]
+MANIFESTATIONS = [
+    'Se manifeste sous la forme du ciel lui-même', 'Vieillard vêtu de blanc',
+    'Femme à la queue de poisson', 'Éclair fendant les nuages', 'Serpent gigantesque enroulé autour du monde',
+]
+TITLES = ['Lion du Mali', 'Roi des rois', 'Fils du tonnerre', 'Mère du peuple', 'Chasseur invincible']
+ACHIEVEMENTS = [
+    "Fondateur de l'Empire du Mali, unificateur du peuple mandingue",
+    'A vaincu le sorcier-roi et libéré son peuple',
+    'A traversé le fleuve des morts pour ramener le feu',
+    "A mené la résistance contre l'envahisseur pendant sept ans",
+]
+HABITATS = ['Marais de Likouala', 'Forêt sacrée', 'Fond des lacs', 'Savane', 'Grottes des montagnes']
+DIETS = ['Végétarien, se nourrit de plantes', 'Carnivore', 'Se nourrit des âmes', 'Inconnu']
+SIZES = ['Grand, similaire à un éléphant', 'Petit comme un enfant', 'Gigantesque', 'Variable']
+WEAKNESSES = ['Inconnues', 'Le feu', 'Le sel', 'Les chants sacrés', 'La lumière du jour']
+STRENGTHS = ['Élusive, puissante', 'Force surhumaine', 'Invisibilité', 'Change de forme', 'Venin mortel']
+CAPTIONS = [
+    'Statue en bois sculpté', 'Masque cérémoniel', 'Gravure ancienne', 'Peinture murale',
+    'Figurine en bronze', 'Illustration contemporaine',
+]
+
+
+def _pick(rng, pool, low=0, high=4):
+    """Return a list of distinct values from pool, sized like the real corpus arrays."""
+    return rng.sample(pool, rng.randint(low, min(high, len(pool))))
+
+
+def _slugify(value):
+    value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode('ascii')
+    return '-'.join(value.lower().split())
+
+
+def _name(rng):
+    word = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return word.capitalize()
+
+
+def generate_entities(count, seed=0, images=True):
+    """Yield `count` entity dicts, deterministic for a given seed."""
+    rng = random.Random(seed)
+    types = ['Divinity', 'Hero', 'Mythical Creature']
+    seen = set()
+
+    for index in range(count):
+        entity_type = types[index % len(types)]
+        name = _name(rng)
+        if (name, entity_type) in seen:
+            name = f'{name} {index}'
+        seen.add((name, entity_type))
+
+        country = rng.choice(list(COUNTRIES))
+        entity = {
+            'name': name,
+            'entity_type': entity_type,
+            'country_of_origin': country,
+            'ethnicity': rng.choice(COUNTRIES[country]),
+            'gender': rng.choice(GENDERS),
+        }
+
+        if entity_type == 'Divinity':
+            entity.update({
+                'cultural_role': rng.choice(CULTURAL_ROLES),
+                'pantheon': f"Panthéon {entity['ethnicity']}",
+                'alignment': rng.choice(ALIGNMENTS),
+                'domains': _pick(rng, DOMAINS, 1, 4),
+                'main_symbols': _pick(rng, SYMBOLS, 1, 3),
+                'characteristics': _pick(rng, CHARACTERISTICS, 1, 3),
+                'manifestations': rng.choice(MANIFESTATIONS),
+                'symbolic_animals': _pick(rng, ANIMALS, 0, 2),
+                'power_objects': _pick(rng, POWER_OBJECTS, 0, 2),
+                'consorts': [_name(rng) for _ in range(rng.randint(0, 2))],
+            })
+        elif entity_type == 'Hero':
+            entity.update({
+                'titles': rng.choice(TITLES),
+                'achievements': rng.choice(ACHIEVEMENTS),
+                'enemies': [_name(rng) for _ in range(rng.randint(0, 3))],
+                'allies': [_name(rng) for _ in range(rng.randint(0, 3))],
+            })
+        else:
+            entity.update({
+                'habitat': rng.choice(HABITATS),
+                'diet': rng.choice(DIETS),
+                'size': rng.choice(SIZES),
+                'weaknesses': rng.choice(WEAKNESSES),
+                'strengths': rng.choice(STRENGTHS),
+            })
+
+        if images:
+            slug = _slugify(name)
+            entity['images'] = [
+                {
+                    'image': f'entities/images/synthetic/{slug}-{position}.jpg',
+                    'caption': f'{rng.choice(CAPTIONS)} de {name}',
+                }
+                for position in range(rng.randint(0, 3))
+            ]
+
+        yield entity
+
+
+def write_corpus(path, count, seed=0, images=True):
+    """Stream the generated corpus to a JSON file without holding it in memory."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[\n')
+        for index, entity in enumerate(generate_entities(count, seed=seed, images=images)):
+            if index:
+                f.write(',\n')
+            f.write(json.dumps(entity, ensure_ascii=False))
+        f.write('\n]\n')
@@ -1,3 +1,318 @@
-from django.test import TestCase
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.routers import DefaultRouter
+from rest_framework.test import APIRequestFactory
+from unittest import mock
+from afric_mythology_api.throttling import get_bucket_store
+from .models import Entity, HeroDetails, ImageWithCaption, DivinityDetails
+from .serializers import EntitySerializer
+from .snapshot import Snapshot, SnapshotError, get_snapshot, write_snapshot
+from .synthetic import generate_entities, write_corpus
+from .views import SnapshotEntityViewSet
+import io
+import json
+import os
+import tempfile
 
-# Create your tests here.
+DATA_FILE = os.path.join(settings.BASE_DIR, 'datas', 'entities_data.json')
+
+
+class SyntheticCorpusTests(SimpleTestCase):
+    def test_same_seed_gives_same_corpus(self):
+        self.assertEqual(list(generate_entities(300, seed=4)), list(generate_entities(300, seed=4)))
+        self.assertNotEqual(list(generate_entities(300, seed=4)), list(generate_entities(300, seed=5)))
+
+    def test_name_and_type_are_unique(self):
+        entities = list(generate_entities(5000))
+        pairs = {(entity['name'], entity['entity_type']) for entity in entities}
+        self.assertEqual(len(pairs), len(entities))
+
+    def test_shape_matches_entities_data(self):
+        with open(DATA_FILE, encoding='utf-8') as f:
+            expected = {entity['entity_type']: set(entity) for entity in json.load(f)}
+
+        for entity in generate_entities(30):
+            self.assertEqual(set(entity) - {'images'}, expected[entity['entity_type']])
+            for image in entity['images']:
+                self.assertEqual(set(image), {'image', 'caption'})
+
+    def test_no_images(self):
+        for entity in generate_entities(30, images=False):
+            self.assertNotIn('images', entity)
+
+
+class LoadDataTests(TestCase):
+    def load(self, entities):
+        with tempfile.TemporaryDirectory() as tmp:
+            json_file = os.path.join(tmp, 'corpus.json')
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(entities, f)
+            call_command('load_data', json_file, stdout=io.StringIO())
+
+    def test_load_entities_data(self):
+        with open(DATA_FILE, encoding='utf-8') as f:
+            self.load(json.load(f))
+        self.assertEqual(Entity.objects.count(), 3)
+        self.assertEqual(Entity.objects.get(name='Olorun').divinity_details.domains, ['Ciel', 'Création', 'Soleil'])
+        self.assertFalse(Entity.objects.get(name='Olorun').images.exists())
+
+    def test_load_images(self):
+        entity = {
+            'name': 'Oshun',
+            'entity_type': 'Divinity',
+            'cultural_role': 'Déesse des eaux',
+            'images': [
+                {'image': 'entities/images/synthetic/oshun-0.jpg', 'caption': 'Statue en bois sculpté'},
+                {'image': 'entities/images/synthetic/oshun-1.jpg'},
+            ],
+        }
+        self.load([entity])
+
+        images = Entity.objects.get(name='Oshun').images.order_by('pk')
+        self.assertEqual(
+            [(image.image.name, image.caption) for image in images],
+            [
+                ('entities/images/synthetic/oshun-0.jpg', 'Statue en bois sculpté'),
+                ('entities/images/synthetic/oshun-1.jpg', None),
+            ],
+        )
+
+    def test_load_synthetic_corpus(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            json_file = os.path.join(tmp, 'corpus.json')
+            write_corpus(json_file, 30, seed=1)
+            call_command('load_data', json_file, stdout=io.StringIO())
+
+        entities = list(generate_entities(30, seed=1))
+        self.assertEqual(Entity.objects.count(), 30)
+        self.assertEqual(
+            sum(len(entity['images']) for entity in entities),
+            Entity.images.through.objects.count(),
+        )
+
+
+class EntityApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.hero = Entity.objects.create(name='Soundiata Keïta', entity_type='Hero', country_of_origin='Mali')
+        HeroDetails.objects.create(entity=cls.hero, titles='Lion du Mali', enemies=['Soumaoro Kanté'])
+        cls.hero.images.add(ImageWithCaption.objects.create(image='entities/images/soundiata.jpg', caption='Statue'))
+        cls.divinity = Entity.objects.create(name='Olorun', entity_type='Divinity', country_of_origin='Nigeria')
+        DivinityDetails.objects.create(entity=cls.divinity, cultural_role='Dieu suprême', domains=['Ciel'])
+
+    def setUp(self):
+        get_bucket_store.cache_clear()
+
+    def test_full_representation(self):
+        # count, entités avec jointures, images
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/entities/')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([set(entity) for entity in results], [set(EntitySerializer.Meta.fields)] * 2)
+        self.assertEqual(results[0]['hero_details']['enemies'], ['Soumaoro Kanté'])
+        self.assertIsNone(results[0]['divinity_details'])
+        self.assertEqual(results[0]['images'][0]['caption'], 'Statue')
+
+    def test_sparse_fields(self):
+        with self.assertNumQueries(2) as queries:
+            response = self.client.get('/api/entities/', {'fields': 'id,name,entity_type,country_of_origin'})
+        self.assertEqual(
+            response.json()['results'][0],
+            {'id': self.hero.pk, 'name': 'Soundiata Keïta', 'entity_type': 'Hero', 'country_of_origin': 'Mali'},
+        )
+        sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('"entities_entity"."ethnicity"', sql)
+
+    def test_expand_one_relation(self):
+        with self.assertNumQueries(2) as queries:
+            response = self.client.get('/api/entities/', {'expand': 'hero_details'})
+        entity = response.json()['results'][0]
+        self.assertEqual(
+            set(entity),
+            {'id', 'name', 'entity_type', 'country_of_origin', 'ethnicity', 'gender',
+             'date_created', 'date_modified', 'hero_details'},
+        )
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('entities_herodetails', sql)
+        self.assertNotIn('entities_divinitydetails', sql)
+
+    def test_expand_details_and_images(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/entities/', {'fields': 'name', 'expand': 'details,images'})
+        self.assertEqual(
+            set(response.json()['results'][0]),
+            {'name', 'images', 'divinity_details', 'hero_details', 'creature_details'},
+        )
+
+    def test_retrieve_and_search(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/entities/{self.divinity.pk}/', {'fields': 'name', 'expand': 'divinity_details'})
+        self.assertEqual(set(response.json()), {'name', 'divinity_details'})
+        self.assertEqual(response.json()['divinity_details']['domains'], ['Ciel'])
+
+        response = self.client.get('/api/entities/', {'search': 'olo', 'fields': 'name'})
+        self.assertEqual(response.json()['results'], [{'name': 'Olorun'}])
+        response = self.client.get('/api/entities/', {'name': 'OLORUN', 'fields': 'name'})
+        self.assertEqual(response.json()['results'], [{'name': 'Olorun'}])
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/entities/', {'fields': 'name,secret'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/entities/', {'expand': 'name'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_empty_selection(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/entities/', {'fields': ''})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/entities/', {'fields': ' , ', 'expand': ''})
+        self.assertEqual(response.status_code, 400)
+
+
+class SnapshotTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'entities.snapshot')
+
+    def build(self, entities):
+        """Write `entities` with ids 2, 4, 6... and return the opened snapshot."""
+        records = []
+        for position, entity in enumerate(entities):
+            entity = {'id': (position + 1) * 2, **entity}
+            records.append((entity['id'], entity['name'], json.dumps(entity).encode()))
+        self.assertEqual(write_snapshot(self.path, records), len(records))
+        return Snapshot(self.path)
+
+    def test_round_trip(self):
+        entities = list(generate_entities(200))
+        snapshot = self.build(entities)
+        self.assertEqual(len(snapshot), 200)
+        self.assertEqual([snapshot.record(position) for position in range(200)],
+                         [{'id': (position + 1) * 2, **entity} for position, entity in enumerate(entities)])
+
+    def test_position_of(self):
+        snapshot = self.build(generate_entities(50))
+        self.assertEqual(snapshot.position_of(2), 0)
+        self.assertEqual(snapshot.position_of(64), 31)
+        self.assertEqual(snapshot.position_of(100), 49)
+        for missing in [0, 1, 63, 101, 2 ** 40]:
+            self.assertIsNone(snapshot.position_of(missing))
+
+    def test_find_by_name(self):
+        snapshot = self.build([
+            {'name': 'Shango', 'entity_type': 'Divinity'},
+            {'name': 'Oshun', 'entity_type': 'Divinity'},
+            {'name': 'Shango', 'entity_type': 'Hero'},
+            {'name': 'Straße', 'entity_type': 'Hero'},
+        ])
+        self.assertEqual(snapshot.find_by_name('SHANGO'), [0, 2])
+        self.assertEqual(snapshot.find_by_name('oshun'), [1])
+        self.assertEqual(snapshot.find_by_name('STRASSE'), [])
+        self.assertEqual(snapshot.find_by_name('straße'), [3])
+        self.assertEqual(snapshot.find_by_name('Shan'), [])
+
+    def test_search_matches_brute_force(self):
+        entities = list(generate_entities(2000))
+        snapshot = self.build(entities)
+        for terms in [['ba'], ['KO'], ['ba', 'ko'], ['a', 'e', 'o'], ['zzz'], []]:
+            expected = [
+                position for position, entity in enumerate(entities)
+                if all(term.lower() in entity['name'].lower() for term in terms)
+            ]
+            self.assertEqual(snapshot.search(terms), expected, terms)
+
+    def test_empty_snapshot(self):
+        snapshot = self.build([])
+        self.assertEqual(len(snapshot), 0)
+        self.assertIsNone(snapshot.position_of(2))
+        self.assertEqual(snapshot.find_by_name('Shango'), [])
+        self.assertEqual(snapshot.search(['a']), [])
+
+    def test_bad_magic(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'NOTASNAP' + b'\0' * 100)
+        with self.assertRaises(SnapshotError):
+            Snapshot(self.path)
+
+        with open(self.path, 'wb') as f:
+            f.write(b'AFM')
+        with self.assertRaises(SnapshotError):
+            Snapshot(self.path)
+
+        open(self.path, 'wb').close()
+        with self.assertRaises(SnapshotError):
+            Snapshot(self.path)
+
+    def test_checked_at_startup(self):
+        get_snapshot.cache_clear()
+        self.addCleanup(get_snapshot.cache_clear)
+        config = apps.get_app_config('entities')
+
+        write_snapshot(self.path, [])
+        with self.settings(ENTITY_SNAPSHOT=self.path):
+            config.ready()
+        with self.settings(ENTITY_SNAPSHOT=self.path + '.missing'):
+            get_snapshot.cache_clear()
+            with self.assertRaises(ImproperlyConfigured):
+                config.ready()
+
+
+class SnapshotApiTests(SimpleTestCase):
+    """SimpleTestCase: any database query would fail the test."""
+
+    def setUp(self):
+        get_bucket_store.cache_clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, 'entities.snapshot')
+        records = [
+            (2, 'Olorun', json.dumps({'id': 2, 'name': 'Olorun', 'images': []}).encode()),
+            (4, 'Oshun', json.dumps({'id': 4, 'name': 'Oshun', 'images': [{'image': '/media/oshun.jpg'}]}).encode()),
+        ]
+        write_snapshot(path, records)
+        patcher = mock.patch('entities.views.get_snapshot', return_value=Snapshot(path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, action, path, **kwargs):
+        view = SnapshotEntityViewSet.as_view({'get': action})
+        response = view(APIRequestFactory().get(path), **kwargs)
+        response.render()
+        return response
+
+    def test_list(self):
+        response = self.get('list', '/api/entities/?search=osh&fields=name,images')
+        self.assertEqual(response.data['results'], [{'name': 'Oshun', 'images': [{'image': 'http://testserver/media/oshun.jpg'}]}])
+
+    def test_retrieve(self):
+        self.assertEqual(self.get('retrieve', '/api/entities/2/', pk='2').data, {'id': 2, 'name': 'Olorun', 'images': []})
+        for pk in ['3', '²', '٣', 'abc']:
+            self.assertEqual(self.get('retrieve', f'/api/entities/{pk}/', pk=pk).status_code, 404, pk)
+
+    @override_settings(RATE_LIMIT={'CAPACITY': 10, 'REFILL_RATE': 0.001, 'CACHE': None})
+    def test_throttle_costs(self):
+        get_bucket_store.cache_clear()
+        self.addCleanup(get_bucket_store.cache_clear)
+
+        remaining = [
+            self.get('retrieve', '/api/entities/2/', pk='2')['RateLimit-Remaining'],
+            self.get('list', '/api/entities/')['RateLimit-Remaining'],
+            self.get('list', '/api/entities/?search=osh')['RateLimit-Remaining'],
+            self.get('list', '/api/entities/?name=oshun')['RateLimit-Remaining'],
+        ]
+        # retrieve 1, list 2, search 5 : la deuxième recherche n'a plus assez de jetons
+        self.assertEqual(remaining, ['9', '7', '2', '2'])
+        self.assertEqual(self.get('list', '/api/entities/?name=oshun').status_code, 429)
+
+    def test_retrieve_route_only_matches_ascii_digits(self):
+        router = DefaultRouter()
+        router.register('entities', SnapshotEntityViewSet, basename='entity')
+        detail = next(url for url in router.urls if url.name == 'entity-detail')
+        self.assertIsNotNone(detail.resolve('entities/4/'))
+        self.assertIsNone(detail.resolve('entities/²/'))
@@ -0,0 +1,12 @@
+from django.conf import settings
+from rest_framework.routers import DefaultRouter
+from .views import EntityViewSet, SnapshotEntityViewSet
+
+router = DefaultRouter()
+router.register(
+    'entities',
+    SnapshotEntityViewSet if settings.ENTITY_SNAPSHOT else EntityViewSet,
+    basename='entity',
+)
+
+urlpatterns = router.urls
@@ -1,3 +1,168 @@
-from django.shortcuts import render
+from rest_framework import filters, viewsets
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from afric_mythology_api.throttling import RateLimitMixin
+from .models import Entity
+from .serializers import EntitySerializer
+from .snapshot import SnapshotRecords, get_snapshot
 
-# Create your views here.
+DETAILS_FIELDS = ['divinity_details', 'hero_details', 'creature_details']
+
+
+class EntityPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class EntityFieldsMixin:
+    """
+    Parse the `?fields=` and `?expand=` query parameters.
+
+    `?fields=id,name` restricts the rendered fields and `?expand=images,details`
+    picks which related fields (created_by, images, divinity_details,
+    hero_details, creature_details, or `details` for the three of them) are
+    rendered. Without either parameter every field is rendered, selecting no
+    field at all is a 400.
+    """
+
+    def get_query_list(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+    def get_selected_fields(self):
+        """Return the field names to render, or None for the full representation."""
+        if hasattr(self, '_selected_fields'):
+            return self._selected_fields
+
+        fields = self.get_query_list('fields')
+        expand = self.get_query_list('expand')
+        selected_fields = None
+
+        if fields is not None or expand is not None:
+            known_fields = EntitySerializer.Meta.fields
+            expandable_fields = EntitySerializer.EXPANDABLE_FIELDS
+
+            expand = expand or []
+            if 'details' in expand:
+                expand = [name for name in expand if name != 'details'] + DETAILS_FIELDS
+            unknown_fields = [name for name in expand if name not in expandable_fields]
+            if fields is None:
+                fields = [name for name in known_fields if name not in expandable_fields]
+            unknown_fields += [name for name in fields if name not in known_fields]
+            if unknown_fields:
+                raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown_fields)}."})
+
+            selected_fields = [name for name in known_fields if name in fields or name in expand]
+            if not selected_fields:
+                raise ValidationError({'fields': 'At least one field must be selected.'})
+
+        self._selected_fields = selected_fields
+        return selected_fields
+
+
+class EntityRateLimitMixin(RateLimitMixin):
+    """ Searches (`?search=` or `?name=`) cost more than lists, which cost more than detail reads """
+    throttle_costs = {'retrieve': 1, 'list': 2, 'search': 5}
+
+    def get_throttle_cost(self, request):
+        params = request.query_params
+        if self.action == 'list' and (params.get(filters.SearchFilter.search_param) or params.get('name')):
+            return self.throttle_costs['search']
+        return super().get_throttle_cost(request)
+
+
+class EntityViewSet(EntityRateLimitMixin, EntityFieldsMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    List, retrieve and search (`?search=`, or `?name=` for an exact name) entities.
+
+    The queryset only loads the columns, joins and prefetches needed for the
+    fields selected with `?fields=` and `?expand=`.
+    """
+    serializer_class = EntitySerializer
+    pagination_class = EntityPagination
+    filter_backends = [filters.SearchFilter]
+    search_fields = ['name']
+
+    def get_queryset(self):
+        selected_fields = self.get_selected_fields()
+        if selected_fields is None:
+            selected_fields = EntitySerializer.Meta.fields
+        queryset = Entity.objects.order_by('pk')
+        name = self.request.query_params.get('name')
+        if name:
+            queryset = queryset.filter(name__iexact=name)
+
+        only_fields = ['id'] + [
+            name for name in selected_fields
+            if name not in EntitySerializer.EXPANDABLE_FIELDS and name != 'id'
+        ]
+        select_related = [name for name in DETAILS_FIELDS if name in selected_fields]
+        only_fields += select_related
+        if 'created_by' in selected_fields:
+            only_fields += ['created_by', 'created_by__username']
+            select_related.append('created_by')
+
+        queryset = queryset.only(*only_fields)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if 'images' in selected_fields:
+            queryset = queryset.prefetch_related('images')
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['selected_fields'] = self.get_selected_fields()
+        return context
+
+
+class SnapshotEntityViewSet(EntityRateLimitMixin, EntityFieldsMixin, viewsets.ViewSet):
+    """
+    Same endpoints as EntityViewSet, served from the snapshot file set by
+    settings.ENTITY_SNAPSHOT (see the build_snapshot command) without any
+    database access.
+    """
+    # Pas d'authentification : elle passerait par la base (sessions, utilisateurs)
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    pagination_class = EntityPagination
+    # Chiffres ASCII seulement : '\d' accepterait aussi '²', que int() refuse
+    lookup_value_regex = '[0-9]+'
+
+    def to_representation(self, record):
+        selected_fields = self.get_selected_fields()
+        if selected_fields is not None:
+            record = {name: record[name] for name in selected_fields}
+        for image in record.get('images') or []:
+            if image['image']:
+                image['image'] = self.request.build_absolute_uri(image['image'])
+        return record
+
+    def list(self, request):
+        snapshot = get_snapshot()
+        positions = None
+
+        name = request.query_params.get('name')
+        if name:
+            positions = snapshot.find_by_name(name)
+
+        search = request.query_params.get(filters.SearchFilter.search_param, '')
+        terms = search.replace(',', ' ').split()
+        if terms:
+            found = snapshot.search(terms)
+            positions = found if positions is None else sorted(set(positions) & set(found))
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(SnapshotRecords(snapshot, positions), request, view=self)
+        return paginator.get_paginated_response([self.to_representation(record) for record in page])
+
+    def retrieve(self, request, pk=None):
+        snapshot = get_snapshot()
+        position = snapshot.position_of(int(pk)) if pk.isascii() and pk.isdigit() else None
+        if position is None:
+            raise NotFound()
+        return Response(self.to_representation(snapshot.record(position)))